@@ -1,35 +1,33 @@
+from plotting_common import apply_theme, get_palette  # must precede pyplot: Agg backend setup
+
 import seaborn as sns
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
-# Set random seed for reproducibility
-np.random.seed(42)
+# Seeded generator for reproducibility
+rng = np.random.default_rng(42)
 
 # Generate realistic synthetic data for customer segments
-# Creating different customer segments with varying purchase behaviors
-segments = []
-purchase_amounts = []
-
-# Premium Segment - Higher spending customers
-premium_purchases = np.random.gamma(shape=5, scale=50, size=150)
-segments.extend(["Premium"] * 150)
-purchase_amounts.extend(premium_purchases)
-
-# Standard Segment - Medium spending customers
-standard_purchases = np.random.gamma(shape=3, scale=30, size=200)
-segments.extend(["Standard"] * 200)
-purchase_amounts.extend(standard_purchases)
-
-# Budget Segment - Lower spending customers
-budget_purchases = np.random.gamma(shape=2, scale=20, size=180)
-segments.extend(["Budget"] * 180)
-purchase_amounts.extend(budget_purchases)
+# Creating different customer segments with varying purchase behaviors:
+# Premium - higher spending, Standard - medium spending,
+# Budget - lower spending, VIP - highest spending
+segment_names = ["Premium", "Standard", "Budget", "VIP"]
+segment_sizes = [150, 200, 180, 100]
+gamma_shapes = [5, 3, 2, 6]
+gamma_scales = [50, 30, 20, 70]
+
+# One vectorized draw covers all segments via per-sample shape/scale arrays
+purchase_amounts = rng.gamma(
+    np.repeat(gamma_shapes, segment_sizes), np.repeat(gamma_scales, segment_sizes)
+)
 
-# VIP Segment - Highest spending customers
-vip_purchases = np.random.gamma(shape=6, scale=70, size=100)
-segments.extend(["VIP"] * 100)
-purchase_amounts.extend(vip_purchases)
+# Ordered categorical gives the boxplot its Budget -> VIP axis order directly
+segments = pd.Categorical(
+    np.repeat(segment_names, segment_sizes),
+    categories=["Budget", "Standard", "Premium", "VIP"],
+    ordered=True,
+)
 
 # Create DataFrame
 data = pd.DataFrame(
@@ -37,44 +35,44 @@ data = pd.DataFrame(
 )
 
 # Set Seaborn style and context for professional appearance
-sns.set_style("whitegrid")
-sns.set_context("talk", font_scale=0.9)
+apply_theme()
 
 # Create figure with specified size for 512x512 output
-plt.figure(figsize=(8, 8))
+fig, ax = plt.subplots(figsize=(8, 8))
 
 # Create boxplot with professional styling
-ax = sns.boxplot(
+sns.boxplot(
+    ax=ax,
     data=data,
     x="Customer Segment",
     y="Purchase Amount ($)",
-    palette="Set2",
+    palette=list(get_palette("Set2", len(segment_names))),
     linewidth=2,
-    order=["Budget", "Standard", "Premium", "VIP"],
 )
 
 # Customize the plot
-plt.title(
+ax.set_title(
     "Purchase Amount Distribution by Customer Segment",
     fontsize=16,
     fontweight="bold",
     pad=20,
 )
-plt.xlabel("Customer Segment", fontsize=13, fontweight="bold")
-plt.ylabel("Purchase Amount ($)", fontsize=13, fontweight="bold")
+ax.set_xlabel("Customer Segment", fontsize=13, fontweight="bold")
+ax.set_ylabel("Purchase Amount ($)", fontsize=13, fontweight="bold")
 
 # Rotate x-axis labels for better readability
-plt.xticks(rotation=0, ha="center")
+plt.setp(ax.get_xticklabels(), rotation=0, ha="center")
 
 # Add grid for better readability
 ax.yaxis.grid(True, alpha=0.3)
 ax.set_axisbelow(True)
 
 # Adjust layout to prevent label cutoff
-plt.tight_layout()
+fig.tight_layout()
 
 # Save the chart with exact dimensions (512x512 pixels)
 # Remove bbox_inches='tight' to maintain exact dimensions
-plt.savefig("chart.png", dpi=64)
+fig.savefig("chart.png", dpi=64)
+plt.close(fig)
 
 print("Chart generated successfully: chart.png (512x512 pixels)")
@@ -0,0 +1,35 @@
+"""Shared matplotlib/seaborn setup for the root plotting scripts.
+
+Import this before `matplotlib.pyplot`: it selects the non-interactive Agg
+backend (and a persistent font-cache directory if the home directory isn't
+writable) once per process, so scripts run back to back in one pipeline
+(chart.py, q4.py) share that setup instead of repeating it.
+"""
+
+import functools
+import os
+
+# Without a writable home, matplotlib falls back to a throwaway temp dir and
+# rebuilds its font cache on every run; only then use a persistent repo-local
+# dir. An explicit MPLCONFIGDIR, or a normal home, is left untouched.
+if "MPLCONFIGDIR" not in os.environ and not os.access(os.path.expanduser("~"), os.W_OK):
+    os.environ["MPLCONFIGDIR"] = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), ".matplotlib"
+    )
+
+import matplotlib
+
+matplotlib.use("Agg")  # file output only; skip GUI backend discovery
+
+import seaborn as sns
+
+
+def apply_theme():
+    """Apply the whitegrid/talk Seaborn theme used by the boxplot."""
+    sns.set_theme(style="whitegrid", context="talk", font_scale=0.9)
+
+
+@functools.cache
+def get_palette(name, n_colors=None):
+    """Return a memoized Seaborn palette as a tuple of RGB colors."""
+    return tuple(sns.color_palette(name, n_colors))
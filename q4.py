@@ -1,3 +1,5 @@
+import plotting_common  # noqa: F401  (must precede pyplot: Agg backend setup)
+
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -5,20 +7,66 @@ import seaborn as sns
 from openpyxl import load_workbook
 from openpyxl.utils.dataframe import dataframe_to_rows
 
-# Read the Excel file
-excel_file = "q-excel-correlation-heatmap.xlsx"
 
-# Try to read the data
-try:
-    # Read the first sheet to see what's there
-    df = pd.read_excel(excel_file, sheet_name=0)
-    print("Data from Excel file:")
-    print(df.head())
-    print("\nColumns:", df.columns.tolist())
-    print("\nShape:", df.shape)
-
-    # Calculate correlation matrix
-    correlation_matrix = df.corr()
+def read_first_sheet(path):
+    """Read the first worksheet like ``pd.read_excel(path, sheet_name=0)``.
+
+    Uses openpyxl read-only, values-only mode, which streams rows without
+    building the full cell graph.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = [list(r) for r in wb.worksheets[0].iter_rows(values_only=True)]
+    finally:
+        wb.close()
+
+    # iter_rows follows the sheet's stored dimension, which can include blank
+    # padding; trim trailing empty cells and rows the way read_excel does
+    for row in rows:
+        while row and row[-1] in (None, ""):
+            row.pop()
+    while rows and not rows[-1]:
+        rows.pop()
+    if not rows:
+        return pd.DataFrame()
+
+    width = max(len(row) for row in rows)
+    rows = [row + [None] * (width - len(row)) for row in rows]
+    header = [
+        f"Unnamed: {i}" if h in (None, "") else h for i, h in enumerate(rows[0])
+    ]
+    df = pd.DataFrame(rows[1:], columns=header)
+    # read_excel gives named-but-empty columns float NaN rather than None
+    empty = df.columns[df.isna().all()]
+    df[empty] = df[empty].astype(np.float64)
+    return df
+
+
+def compute_and_plot(df):
+    """Compute the correlation matrix, save it to CSV and render the heatmap."""
+    # Calculate correlation matrix on a contiguous float64 array: np.corrcoef
+    # is a single BLAS-backed product when there are no NaNs to skip. It needs
+    # at least two columns and nonzero variance everywhere; anything else
+    # (one column, constant columns, NaNs) goes through pandas, which reports
+    # NaN for undefined correlations
+    numeric = df.select_dtypes(include=[np.number])
+    cols = numeric.columns
+    arr = numeric.to_numpy(dtype=np.float64, copy=False)
+    if (
+        arr.shape[1] >= 2
+        and np.isfinite(arr).all()
+        and (arr.std(axis=0) > 0).all()
+    ):
+        corr_mat = np.atleast_2d(np.corrcoef(arr, rowvar=False))
+        # BLAS rounding leaves corrcoef slightly asymmetric (the two
+        # Inventory_Levels/Order_Frequency cells differ by ~3e-17 on the
+        # workbook) and the diagonal at 0.9999999999999999; pandas writes
+        # an exactly symmetric matrix with 1.0 on the diagonal
+        corr_mat = (corr_mat + corr_mat.T) / 2
+        np.fill_diagonal(corr_mat, 1.0)
+    else:
+        corr_mat = pd.DataFrame(arr).corr().to_numpy()
+    correlation_matrix = pd.DataFrame(corr_mat, index=cols, columns=cols)
     print("\nCorrelation Matrix:")
     print(correlation_matrix)
 
@@ -27,14 +75,16 @@ try:
     print("\nCorrelation matrix saved to correlation.csv")
 
     # Create heatmap visualization
-    fig = plt.figure(figsize=(6.5, 6.5))
+    fig, ax = plt.subplots(figsize=(6.5, 6.5))
 
     # Create heatmap with red-white-green colormap
     # Using RdYlGn (Red-Yellow-Green) which is similar to Excel's red-white-green
+    # Preformat all annotations in one vectorized call rather than per cell
+    annot_arr = np.char.mod("%.2f", correlation_matrix.to_numpy())
     sns.heatmap(
         correlation_matrix,
-        annot=True,
-        fmt=".2f",
+        annot=annot_arr,
+        fmt="",
         cmap="RdYlGn",
         center=0,
         vmin=-1,
@@ -42,18 +92,34 @@ try:
         square=True,
         linewidths=0.5,
         cbar_kws={"shrink": 0.8},
+        ax=ax,
     )
 
-    plt.title(
+    ax.set_title(
         "Supply Chain Metrics - Correlation Heatmap", fontsize=12, fontweight="bold"
     )
-    plt.tight_layout()
+    # Fit margins to the data-driven tick labels; unlike bbox_inches="tight"
+    # this keeps the canvas at its real size and needs no extra render pass
+    fig.tight_layout()
 
     # Save as PNG with specified dimensions (400x400 to 512x512)
-    plt.savefig("heatmap.png", dpi=72, bbox_inches="tight")
+    fig.savefig("heatmap.png", dpi=72)
     print("Heatmap saved to heatmap.png")
 
-    plt.close()
+    plt.close(fig)
+
+
+# Read the Excel file
+excel_file = "q-excel-correlation-heatmap.xlsx"
+
+# Try to read the data
+try:
+    # Read the first sheet to see what's there
+    df = read_first_sheet(excel_file)
+    print("Data from Excel file:")
+    print(df.head())
+    print("\nColumns:", df.columns.tolist())
+    print("\nShape:", df.shape)
 
 except Exception as e:
     print(f"Error: {e}")
@@ -91,39 +157,9 @@ except Exception as e:
 
     print(f"\nData saved to {excel_file}")
 
-    # Calculate correlation matrix
-    correlation_matrix = df.corr()
-    print("\nCorrelation Matrix:")
-    print(correlation_matrix)
-
-    # Save correlation matrix to CSV
-    correlation_matrix.to_csv("correlation.csv")
-    print("\nCorrelation matrix saved to correlation.csv")
-
-    # Create heatmap visualization
-    fig = plt.figure(figsize=(6.5, 6.5))
-
-    sns.heatmap(
-        correlation_matrix,
-        annot=True,
-        fmt=".2f",
-        cmap="RdYlGn",
-        center=0,
-        vmin=-1,
-        vmax=1,
-        square=True,
-        linewidths=0.5,
-        cbar_kws={"shrink": 0.8},
-    )
-
-    plt.title(
-        "Supply Chain Metrics - Correlation Heatmap", fontsize=12, fontweight="bold"
-    )
-    plt.tight_layout()
-
-    plt.savefig("heatmap.png", dpi=72, bbox_inches="tight")
-    print("Heatmap saved to heatmap.png")
-
-    plt.close()
-
-print("\nAll files generated successfully!")
+# Data acquisition is done; correlate and render exactly once
+if df.empty:
+    print(f"\nNo data in the first sheet of {excel_file}; nothing to plot.")
+else:
+    compute_and_plot(df)
+    print("\nAll files generated successfully!")
@@ -9,50 +9,52 @@ colormap and places labels on circles when space allows.
 import json
 import math
 import os
-import random
-from collections import defaultdict
+
+import matplotlib
+
+matplotlib.use("Agg")  # file output only; skip GUI backend discovery
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import Circle
 import numpy as np
+import pandas as pd
 
 
 def load_and_prepare(json_path, min_rows=15, seed=42):
-    with open(json_path, "r", encoding="utf-8") as fh:
-        data = json.load(fh)
-
-    rows = []
-    for r in data:
-        sector = r.get("sector", "Other")
-        asset = r.get("asset", "Asset")
-        invest = r.get("investment", 0)
-        try:
-            invest = int(invest)
-        except Exception:
-            invest = 0
-        rows.append({"sector": sector, "asset": asset, "investment": invest})
-
-    # Aggregate duplicates
-    agg = defaultdict(int)
-    for r in rows:
-        key = (r["sector"], r["asset"])
-        agg[key] += r["investment"]
-
-    rows = [{"sector": k[0], "asset": k[1], "investment": v} for k, v in agg.items()]
+    # Parse straight from bytes: no text-mode decode/newline translation
+    with open(json_path, "rb") as fh:
+        data = json.loads(fh.read())
+
+    df = pd.DataFrame(data).reindex(columns=["sector", "asset", "investment"])
+    df["sector"] = df["sector"].fillna("Other")
+    df["asset"] = df["asset"].fillna("Asset")
+    df["investment"] = (
+        pd.to_numeric(df["investment"], errors="coerce").fillna(0).astype(np.int64)
+    )
+
+    # Aggregate duplicates (keep first-seen order so ties sort as before)
+    df = df.groupby(["sector", "asset"], as_index=False, sort=False)["investment"].sum()
+    rows = df.to_dict("records")
 
     # Ensure at least min_rows by adding synthetic assets sampled from distribution
-    random.seed(seed)
-    if len(rows) < min_rows:
-        investments = [r["investment"] for r in rows] or [1_000_000]
-        mean = int(sum(investments) / len(investments))
-        std = max(1, int(np.std(investments)))
-        sectors = list({r["sector"] for r in rows}) or ["Other"]
-        i = 1
-        while len(rows) < min_rows:
-            sector = random.choice(sectors)
-            asset = f"{sector} Synthetic {i}"
-            invest = max(50_000, int(random.gauss(mean, std)))
-            rows.append({"sector": sector, "asset": asset, "investment": invest})
-            i += 1
+    n_needed = min_rows - len(rows)
+    if n_needed > 0:
+        arr = np.asarray(df["investment"], dtype=np.int64)
+        if arr.size == 0:
+            arr = np.array([1_000_000], dtype=np.int64)
+        mean = int(arr.mean())
+        std = max(1, int(arr.std()))
+        sectors = df["sector"].unique().tolist() or ["Other"]
+        rng = np.random.default_rng(seed)
+        samples = np.maximum(50_000, rng.normal(mean, std, n_needed).astype(np.int64))
+        sector_choices = rng.choice(sectors, n_needed)
+        rows.extend(
+            {"sector": sector, "asset": f"{sector} Synthetic {i}", "investment": invest}
+            for i, (sector, invest) in enumerate(
+                zip(sector_choices.tolist(), samples.tolist()), start=1
+            )
+        )
 
     # Sort descending by investment
     rows.sort(key=lambda x: x["investment"], reverse=True)
@@ -68,49 +70,51 @@ def pack_circles(radii):
     if not radii:
         return positions
 
+    # Angle tables never change, so compute the trig once up front
+    thetas = np.linspace(0, 2 * math.pi, 60, endpoint=False)
+    unit = np.stack([np.cos(thetas), np.sin(thetas)], axis=-1)
+    angle_steps = np.linspace(0, 2 * math.pi, 90, endpoint=False)
+    cos_steps, sin_steps = np.cos(angle_steps), np.sin(angle_steps)
+    max_r = max(radii)
+
     # Place first at origin
     positions.append((0.0, 0.0))
+    placed_xy = np.zeros((1, 2))
+    placed_r = np.array([radii[0]], dtype=float)
 
     for i in range(1, len(radii)):
         r = radii[i]
         placed = False
-        # Try placing tangent to each existing circle
-        for j, (xj, yj) in enumerate(positions):
-            rj = radii[j]
-            dist = r + rj
-            # sample angles
-            for theta in np.linspace(0, 2 * math.pi, 60, endpoint=False):
-                xi = xj + dist * math.cos(theta)
-                yi = yj + dist * math.sin(theta)
-                ok = True
-                for k, (xk, yk) in enumerate(positions):
-                    rk = radii[k]
-                    d = math.hypot(xi - xk, yi - yk)
-                    if d < (r + rk) - 1e-6:
-                        ok = False
-                        break
-                if ok:
-                    positions.append((xi, yi))
-                    placed = True
-                    break
-            if placed:
-                break
+        # Try placing tangent to each existing circle: build every candidate
+        # (existing circle x sampled angle) at once, shape (M, 60, 2)
+        cand = placed_xy[:, None, :] + (placed_r[:, None, None] + r) * unit
+        # Squared distance from each candidate to each placed circle, (M, 60, M)
+        d2 = ((cand[..., None, :] - placed_xy[None, None, :, :]) ** 2).sum(-1)
+        # Clamp before squaring: zero radii give a negative threshold, which the
+        # unsquared distance test always passed
+        thresh = np.maximum(placed_r[None, None, :] + r - 1e-6, 0.0)
+        ok = (d2 >= thresh**2).all(-1).ravel()
+        if ok.any():
+            xi, yi = cand.reshape(-1, 2)[np.argmax(ok)]
+            positions.append((float(xi), float(yi)))
+            placed = True
 
         # Fallback: random jitter search expanding outward
         if not placed:
-            angle_steps = np.linspace(0, 2 * math.pi, 90, endpoint=False)
-            radius_step = max(1.5, max(radii) * 0.1)
+            radius_step = max(1.5, max_r * 0.1)
             attempt = 1
             while not placed and attempt < 200:
-                for theta in angle_steps:
-                    dist = (max(radii) + r) * (1 + attempt * 0.05)
-                    xi = dist * math.cos(theta)
-                    yi = dist * math.sin(theta)
+                dist = (max_r + r) * (1 + attempt * 0.05)
+                xis = dist * cos_steps
+                yis = dist * sin_steps
+                for xi, yi in zip(xis.tolist(), yis.tolist()):
                     ok = True
                     for k, (xk, yk) in enumerate(positions):
                         rk = radii[k]
-                        d = math.hypot(xi - xk, yi - yk)
-                        if d < (r + rk) - 1e-6:
+                        dx = xi - xk
+                        dy = yi - yk
+                        thresh = max((r + rk) - 1e-6, 0.0)
+                        if dx * dx + dy * dy < thresh * thresh:
                             ok = False
                             break
                     if ok:
@@ -123,6 +127,9 @@ def pack_circles(radii):
             # As last resort, place far away
             positions.append((len(positions) * (r * 2.5), 0.0))
 
+        placed_xy = np.vstack([placed_xy, positions[-1]])
+        placed_r = np.append(placed_r, r)
+
     return positions
 
 
@@ -162,31 +169,48 @@ def draw_circle_packing(rows, out_path, size_px=512):
     color_map = {s: cmap(i % cmap.N) for i, s in enumerate(unique_sectors)}
 
     fig, ax = plt.subplots(figsize=(size_px / 100, size_px / 100), dpi=100)
+    # Axes fill the figure so the PNG is exactly size_px square and one data
+    # unit is one pixel; no tight layout/bbox passes needed
+    fig.subplots_adjust(left=0, right=1, bottom=0, top=1)
     ax.set_xlim(0, size_px)
     ax.set_ylim(0, size_px)
     ax.set_aspect("equal")
     ax.axis("off")
 
+    # All circles go into one collection: a single artist/draw call instead of
+    # one transformed patch per row
+    circles = PatchCollection(
+        [Circle((xs[i], ys[i]), radii[i]) for i in range(len(rows))],
+        facecolors=[color_map[r["sector"]] for r in rows],
+        edgecolors="white",
+        linewidths=1.2,
+        alpha=0.95,
+    )
+    ax.add_collection(circles)
+
+    renderer = fig.canvas.get_renderer()
     for i, r in enumerate(rows):
         x, y = xs[i], ys[i]
         rad = radii[i]
-        circ = plt.Circle(
-            (x, y), rad, color=color_map[r["sector"]], ec="white", lw=1.2, alpha=0.95
-        )
-        ax.add_patch(circ)
         # label if enough space
         label = r["asset"]
         if rad > 18:
-            ax.text(
+            fontsize = max(6, int(rad / 4))
+            text = ax.text(
                 x,
                 y,
                 label,
                 ha="center",
                 va="center",
-                fontsize=max(6, int(rad / 4)),
+                fontsize=fontsize,
                 weight="bold",
                 color="black",
             )
+            # Shrink labels that would run off the fixed canvas edges
+            half_width = text.get_window_extent(renderer).width / 2
+            room = min(x, size_px - x) - 2
+            if half_width > room:
+                text.set_fontsize(fontsize * room / half_width)
 
     # Legend (small)
     handles = [
@@ -197,9 +221,8 @@ def draw_circle_packing(rows, out_path, size_px=512):
     ]
     ax.legend(handles, unique_sectors, fontsize=6, loc="lower left", frameon=False)
 
-    plt.tight_layout(pad=0)
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    fig.savefig(out_path, dpi=100, bbox_inches="tight", facecolor="white")
+    fig.savefig(out_path, dpi=100, facecolor="white")
     plt.close(fig)
 
 
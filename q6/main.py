@@ -15,7 +15,7 @@ The script prints concise RAWGraphs instructions after writing the files.
 
 import json
 import os
-import random
+import numpy as np
 import pandas as pd
 
 
@@ -25,25 +25,26 @@ def ensure_min_rows(df, min_rows=15, seed=42):
     Synthetic rows copy sectors from existing data and sample investments
     based on the existing distribution to keep values realistic.
     """
-    random.seed(seed)
-    if len(df) >= min_rows:
+    # Hoist every invariant so each is computed exactly once
+    have = len(df)
+    need = max(0, min_rows - have)
+    if not need:
         return df
 
-    sectors = df['sector'].unique().tolist() if not df.empty else ['Other']
-    mean = int(df['investment'].mean()) if len(df) > 0 else 1_000_000
-    std = int(df['investment'].std()) if len(df) > 0 and df['investment'].std() > 0 else max(1, mean // 6)
-
-    new_rows = []
-    i = 1
-    while len(df) + len(new_rows) < min_rows:
-        sector = random.choice(sectors)
-        asset = f"{sector} Asset {i}"
-        invest = max(50_000, int(random.gauss(mean, std)))
-        new_rows.append({'sector': sector, 'asset': asset, 'investment': invest})
-        i += 1
-
-    if new_rows:
-        df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+    sectors = df['sector'].unique().tolist() if have else ['Other']
+    mean = int(df['investment'].mean()) if have else 1_000_000
+    sd = df['investment'].std() if have else 0
+    std = int(sd) if sd > 0 else max(1, mean // 6)
+
+    rng = np.random.default_rng(seed)
+    investments = np.maximum(50_000, rng.normal(mean, std, need).astype(np.int64))
+    sector_choices = rng.choice(sectors, need).tolist()
+    new_rows = pd.DataFrame({
+        'sector': sector_choices,
+        'asset': [f"{sector} Asset {i}" for i, sector in enumerate(sector_choices, start=1)],
+        'investment': investments,
+    })
+    df = pd.concat([df, new_rows], ignore_index=True)
 
     return df
 
@@ -58,12 +59,13 @@ def main():
         print(f"Error: {json_path} not found. Place your `data.json` next to this script.")
         return
 
-    with open(json_path, 'r', encoding='utf-8') as fh:
-        try:
-            data = json.load(fh)
-        except Exception as e:
-            print('Error reading JSON:', e)
-            return
+    # Parse straight from bytes: no text-mode decode/newline translation
+    try:
+        with open(json_path, 'rb') as fh:
+            data = json.loads(fh.read())
+    except Exception as e:
+        print('Error reading JSON:', e)
+        return
 
     df = pd.DataFrame(data)
     if df.empty:
@@ -86,12 +88,22 @@ def main():
     # Ensure realistic 15-20 rows for RAWGraphs demo/exercise
     df = ensure_min_rows(df, min_rows=15)
 
-    # Optionally sort for nicer presentation
+    # Optionally sort for nicer presentation; a categorical sector sorts on
+    # integer codes (lexical category order) instead of comparing strings
+    df['sector'] = df['sector'].astype('category')
     df = df.sort_values(['sector', 'investment'], ascending=[True, False])
 
     # Write CSV and TSV for RAWGraphs import (both human-friendly)
-    df.to_csv(out_csv, index=False)
-    df.to_csv(out_tsv, index=False, sep='\t')
+    # Serialize once; the TSV is a delimiter swap unless some field needed
+    # quoting (or holds a tab), in which case let pandas write it properly
+    csv_text = df.to_csv(index=False)
+    with open(out_csv, 'w', encoding='utf-8', newline='') as fh:
+        fh.write(csv_text)
+    if '"' in csv_text or '\t' in csv_text:
+        df.to_csv(out_tsv, index=False, sep='\t')
+    else:
+        with open(out_tsv, 'w', encoding='utf-8', newline='') as fh:
+            fh.write(csv_text.replace(',', '\t'))
 
     print(f'Wrote: {out_csv}')
     print(f'Wrote: {out_tsv}')